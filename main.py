@@ -1,15 +1,31 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
 import contextvars
+import inspect
+import math
+import re
+import sys
 import time
-from typing import Any, Protocol, TypeAlias
+import weakref
+from typing import Any, Callable, Protocol, TypeAlias
 
 from astrbot.api import AstrBotConfig, logger
 import astrbot.api.message_components as Comp
 from astrbot.api.event import AstrMessageEvent, filter
+from astrbot.api.provider import Provider
 from astrbot.api.star import Context, Star, register
 
+# 消息链循环中频繁使用，绑定为模块级名称以减少属性查找。
+_Plain = Comp.Plain
+
+# 超时使用上下文管理器，避免 wait_for 每次额外包装一个 Task。
+if sys.version_info >= (3, 11):
+    from asyncio import timeout as _async_timeout
+else:
+    from async_timeout import timeout as _async_timeout
+
 
 DEFAULT_POLISH_PROMPT = (
     "你是一个专业的中文文本润色助手。"
@@ -19,8 +35,34 @@ DEFAULT_POLISH_PROMPT = (
     "待润色文本：\n{{text}}"
 )
 
+POLISH_SYSTEM_PROMPT = "你是一个只输出最终润色文本的助手。"
+
+# 多段文本合并润色时使用，要求模型原样保留 <<SEG n>> 分段标记。
+BATCH_SYSTEM_PROMPT = (
+    "你是一个只输出最终润色文本的助手。"
+    "待润色文本由若干以 <<SEG 序号>> 单独成行标记的分段组成，"
+    "请逐段润色，并原样保留每个分段标记及其顺序，不要合并、拆分或增删分段。"
+)
+
+_SEGMENT_MARKER_RE = re.compile(r"^<<SEG (\d+)>>$", re.MULTILINE)
+
+# 仅由标点、数字、空白、表情等非文字字符组成的文本无需润色。
+_NON_WORD_TEXT_RE = re.compile(r"[\W\d\s]+")
+
+DEFAULT_POLISH_CACHE_SIZE = 512
+DEFAULT_MIN_POLISH_CHARS = 2
+DEFAULT_MAX_POLISH_CHARS = 4096
+# 润色结果允许达到原文长度的倍数，长回复不会被固定上限误判为超长。
+POLISH_OUTPUT_LENGTH_RATIO = 2
 DEFAULT_MARK_RETENTION_SECONDS = 300.0
-DEFAULT_MARK_CHECK_INTERVAL_SECONDS = 60.0
+
+# 失败处理配置项（含 WebUI 中文选项）到内部模式的映射。
+_FAILURE_MODE_MAP: dict[str, str] = {
+    "fallback_original": "fallback_original",
+    "send_error": "send_error",
+    "发送原文（推荐）": "fallback_original",
+    "发送失败提示": "send_error",
+}
 
 
 class ProviderResponseProtocol(Protocol):
@@ -30,7 +72,10 @@ class ProviderResponseProtocol(Protocol):
 
 
 class TextChatProviderProtocol(Protocol):
-    """仅约束本插件用到的提供商能力（text_chat）。"""
+    """仅约束本插件用到的提供商能力（text_chat）。
+
+    若提供商重写了 Provider.text_chat_stream，会优先使用流式接口。
+    """
 
     async def text_chat(
         self,
@@ -41,7 +86,12 @@ class TextChatProviderProtocol(Protocol):
     ) -> ProviderResponseProtocol: ...
 
 
+class _StreamUnavailableError(Exception):
+    """提供商的流式接口在输出首个分片前即报告未实现。"""
+
+
 MessageChain: TypeAlias = list[object]
+EventRef: TypeAlias = "weakref.ReferenceType[AstrMessageEvent]"
 
 _POLISHING_GUARD: contextvars.ContextVar[bool] = contextvars.ContextVar(
     "chat_polisher_polishing",
@@ -53,7 +103,7 @@ _POLISHING_GUARD: contextvars.ContextVar[bool] = contextvars.ContextVar(
     "astrbot_plugin_chat_polisher",
     "cyilin36",
     "在回复发送前调用指定提供商进行文本润色",
-    "1.3",
+    "1.4",
     "https://github.com/cyilin36/astrbot_plugin_chat_polisher",
 )
 class ChatPolisherPlugin(Star):
@@ -64,16 +114,31 @@ class ChatPolisherPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.config = config
-        # key: 事件标识，value: 打标时间(monotonic)
-        self._llm_marks: dict[str, float] = {}
-        self._mark_cleanup_task: asyncio.Task[None] | None = None
+        # key: id(event)（事件不支持弱引用时为组合标识），
+        # value: (打标时间(monotonic_ns), 事件弱引用)；按打标时间从旧到新排列
+        self._llm_marks: OrderedDict[int | str, tuple[int, EventRef | None]] = OrderedDict()
+        # key: (提供商标识, 提示词模板, 系统提示词, 原文)，value: 润色结果；按最近使用排序
+        self._polish_cache: OrderedDict[tuple[str, str, str, str], str] = OrderedDict()
+        # 提示词模板解析结果：原始配置值 -> (模板, 按 {{text}} 切分的片段)
+        self._cached_prompt_source: Any = None
+        self._cached_prompt_parts: tuple[str, tuple[str, ...]] | None = None
+        # 其余配置项解析结果：配置键 -> (原始配置值, 解析后的值)
+        self._parsed_config: dict[str, tuple[Any, Any]] = {}
+        # 是否出现过不支持弱引用、改用组合标识打标的事件
+        self._has_composed_mark_keys = False
 
     @filter.on_llm_request()
     async def mark_ai_reply_flow(self, event: AstrMessageEvent, _req: Any):
         """仅在默认 AI 对话链路触发时记录标记。"""
-        self._ensure_mark_cleanup_task()
-        key = self._build_event_mark_key(event)
-        self._llm_marks[key] = time.monotonic()
+        try:
+            key: int | str = id(event)
+            event_ref: EventRef | None = weakref.ref(event)
+        except TypeError:
+            key = self._build_event_mark_key(event)
+            event_ref = None
+            self._has_composed_mark_keys = True
+        self._llm_marks[key] = (time.monotonic_ns(), event_ref)
+        self._llm_marks.move_to_end(key)
 
     @filter.on_decorating_result(priority=100)
     async def force_polish_before_send(self, event: AstrMessageEvent):
@@ -81,13 +146,22 @@ class ChatPolisherPlugin(Star):
         if _POLISHING_GUARD.get():
             return
 
-        self._ensure_mark_cleanup_task()
         # 无 AI 链路标记时直接跳过（如指令回复）。
         if not self._has_valid_llm_mark(event):
             return
 
         result = event.get_result()
-        if not result or not getattr(result, "chain", None):
+        if not result:
+            return
+        try:
+            chain = result.chain
+        except AttributeError:
+            return
+        if not chain:
+            return
+
+        # 纯富媒体消息链（如仅图片）无需润色，也不必解析提供商。
+        if not any(isinstance(comp, _Plain) for comp in chain):
             return
 
         # 优先使用插件配置；未配置则回退当前会话主 AI。
@@ -98,33 +172,27 @@ class ChatPolisherPlugin(Star):
 
         token = _POLISHING_GUARD.set(True)
         try:
-            success, new_chain = await self._polish_chain_segments(provider, result.chain)
+            success, new_chain = await self._polish_chain_segments(provider, chain)
         finally:
             _POLISHING_GUARD.reset(token)
 
         if not success:
             if self._get_failure_mode() == "send_error":
-                result.chain = self._replace_plain_text(result.chain, self._get_failure_message())
+                result.chain = self._replace_plain_text(chain, self._get_failure_message())
             return
 
-        if new_chain:
+        if new_chain is not chain:
             result.chain = new_chain
 
     async def terminate(self):
-        """插件停用时清理后台任务。"""
-        task = self._mark_cleanup_task
-        self._mark_cleanup_task = None
-        if task and not task.done():
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+        """插件停用时清理内存中的标记与缓存。"""
         self._llm_marks.clear()
+        self._has_composed_mark_keys = False
+        self._polish_cache.clear()
 
     def _resolve_polish_provider(self, event: AstrMessageEvent) -> TextChatProviderProtocol | None:
         """解析润色使用的提供商。"""
-        provider_id = str(self.config.get("polish_provider", "") or "").strip()
+        provider_id = self._get_parsed_config("polish_provider", "", self._parse_stripped_str)
         if provider_id:
             provider = self.context.get_provider_by_id(provider_id=provider_id)
             if provider:
@@ -136,28 +204,35 @@ class ChatPolisherPlugin(Star):
 
         return self.context.get_using_provider(umo=event.unified_msg_origin)
 
-    async def _polish_text(self, provider: TextChatProviderProtocol, text: str) -> str | None:
+    async def _polish_text(
+        self,
+        provider: TextChatProviderProtocol,
+        text: str,
+        system_prompt: str = POLISH_SYSTEM_PROMPT,
+        timeout_seconds: float | None = None,
+    ) -> str | None:
         """调用提供商进行润色，失败时返回 None。"""
-        prompt_tpl = str(self.config.get("polish_prompt", "") or "").strip()
-        if not prompt_tpl:
-            prompt_tpl = DEFAULT_POLISH_PROMPT
-
-        # 支持 {{text}} 占位符；无占位符时自动拼接原文。
-        if "{{text}}" in prompt_tpl:
-            user_prompt = prompt_tpl.replace("{{text}}", text)
-        else:
-            user_prompt = f"{prompt_tpl}\n\n待润色文本：\n{text}"
+        prompt_tpl, prompt_parts = self._get_prompt_parts()
+
+        # 相同文本命中缓存时直接复用，无需再次调用模型。
+        cache_key = (self._get_provider_cache_id(provider), prompt_tpl, system_prompt, text)
+        if self._get_polish_cache_size() > 0:
+            cached = self._polish_cache.get(cache_key)
+            if cached is not None:
+                self._polish_cache.move_to_end(cache_key)
+                return cached
+        elif self._polish_cache:
+            # 缓存被关闭后不再命中旧结果。
+            self._polish_cache.clear()
+
+        user_prompt = text.join(prompt_parts)
+        output_limit = self._get_output_char_limit(text)
 
         try:
-            timeout = self._get_timeout_seconds()
-            resp = await asyncio.wait_for(
-                provider.text_chat(
-                    prompt=user_prompt,
-                    context=[],
-                    system_prompt="你是一个只输出最终润色文本的助手。",
-                ),
-                timeout=timeout,
-            )
+            async with _async_timeout(timeout_seconds or self._get_timeout_seconds()):
+                completion_text = await self._request_polish(
+                    provider, user_prompt, system_prompt, output_limit
+                )
         except asyncio.TimeoutError:
             logger.warning("[chat_polisher] 润色超时。")
             return None
@@ -167,63 +242,226 @@ class ChatPolisherPlugin(Star):
             logger.exception("[chat_polisher] 调用润色模型失败")
             return None
 
-        polished = (resp.completion_text or "").strip() if resp else ""
+        polished = completion_text.strip() if completion_text else ""
         if not polished:
             logger.warning("[chat_polisher] 润色模型返回空文本，保留原文。")
             return None
+
+        if output_limit and len(polished) > output_limit:
+            logger.warning("[chat_polisher] 润色结果超过 %d 字，保留原文。", output_limit)
+            return None
+
+        self._store_polish_cache(cache_key, polished)
         return polished
 
+    async def _request_polish(
+        self,
+        provider: TextChatProviderProtocol,
+        user_prompt: str,
+        system_prompt: str,
+        output_limit: int,
+    ) -> str | None:
+        """请求润色结果；提供商支持流式输出时边接收边检查长度，超长即提前结束。"""
+        if self._supports_streaming(provider):
+            stream = provider.text_chat_stream(
+                prompt=user_prompt, context=[], system_prompt=system_prompt
+            )
+            try:
+                return await self._consume_polish_stream(stream, output_limit)
+            except _StreamUnavailableError:
+                logger.debug("[chat_polisher] 提供商未实现流式输出，改用 text_chat。")
+
+        resp = await provider.text_chat(
+            prompt=user_prompt,
+            context=[],
+            system_prompt=system_prompt,
+        )
+        return resp.completion_text if resp else None
+
+    @staticmethod
+    def _supports_streaming(provider: TextChatProviderProtocol) -> bool:
+        # 基类 Provider 自带未实现的 text_chat_stream，只有子类重写为异步生成器才算支持。
+        stream_impl = getattr(type(provider), "text_chat_stream", None)
+        if stream_impl is None or stream_impl is getattr(Provider, "text_chat_stream", None):
+            return False
+        return inspect.isasyncgenfunction(stream_impl)
+
+    @staticmethod
+    async def _consume_polish_stream(stream: Any, output_limit: int) -> str | None:
+        """边接收边检查长度，超过 output_limit（为 0 时不限制）即提前结束。"""
+        pieces: list[str] = []
+        received = 0
+        chunk_received = False
+        try:
+            async for resp in stream:
+                chunk_received = True
+                text = resp.completion_text if resp else None
+                # 流结束时提供商会再返回一次完整结果（is_chunk=False）。
+                if not getattr(resp, "is_chunk", True):
+                    return text
+                if not text:
+                    continue
+                pieces.append(text)
+                received += len(text)
+                if output_limit and received > output_limit:
+                    # 已确定超长，关闭流以停止远端继续生成，由调用方按超长处理。
+                    break
+        except NotImplementedError as exc:
+            # 尚未收到任何分片即报告未实现时，交由调用方回退到 text_chat。
+            if chunk_received:
+                raise
+            raise _StreamUnavailableError from exc
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose:
+                await aclose()
+        return "".join(pieces)
+
+    @staticmethod
+    def _get_provider_cache_id(provider: TextChatProviderProtocol) -> str:
+        # 不同会话或切换 polish_provider 后可能使用不同模型，缓存需按提供商区分。
+        try:
+            return str(provider.meta().id)
+        except Exception:
+            return f"{type(provider).__qualname__}@{id(provider)}"
+
+    def _store_polish_cache(self, key: tuple[str, str, str, str], polished: str):
+        # 仅在事件循环线程中访问，无需加锁。
+        cache_size = self._get_polish_cache_size()
+        if cache_size <= 0:
+            self._polish_cache.clear()
+            return
+
+        self._polish_cache[key] = polished
+        self._polish_cache.move_to_end(key)
+        while len(self._polish_cache) > cache_size:
+            self._polish_cache.popitem(last=False)
+
+    async def _polish_runs(
+        self, provider: TextChatProviderProtocol, texts: list[str]
+    ) -> list[str | None]:
+        """润色多段文本：多段时合并为一次调用，按分段标记拆回。"""
+        if len(texts) == 1:
+            return [await self._polish_text(provider, texts[0])]
+
+        batched_text = "\n".join(
+            [f"<<SEG {index}>>\n{text}" for index, text in enumerate(texts, start=1)]
+        )
+        # 合并调用需处理多段文本，超时上限按段数放宽。
+        polished = await self._polish_text(
+            provider,
+            batched_text,
+            BATCH_SYSTEM_PROMPT,
+            timeout_seconds=self._get_timeout_seconds() * len(texts),
+        )
+        segments = self._split_batched_text(polished, len(texts)) if polished else None
+        if segments is not None:
+            return segments
+
+        # 合并调用失败或模型未保留分段标记时，逐段并发重新润色。
+        logger.warning("[chat_polisher] 批量润色未得到有效分段结果，改为逐段润色。")
+        return await self._polish_texts_concurrently(provider, texts)
+
+    async def _polish_texts_concurrently(
+        self, provider: TextChatProviderProtocol, texts: list[str]
+    ) -> list[str | None]:
+        """并发润色各段文本，耗时取决于最慢的一段而非总和。"""
+        # 子任务会复制当前上下文，_POLISHING_GUARD 在其中同样生效。
+        results = await asyncio.gather(
+            *(self._polish_text(provider, text) for text in texts),
+            return_exceptions=True,
+        )
+        polished_texts: list[str | None] = []
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                logger.error("[chat_polisher] 分段润色异常: %r", result)
+                polished_texts.append(None)
+                continue
+            polished_texts.append(result)
+        return polished_texts
+
+    @staticmethod
+    def _split_batched_text(polished: str, expected: int) -> list[str] | None:
+        """按分段标记拆分批量润色结果，标记缺失或错序时返回 None。"""
+        # re.split 带捕获组：[前导, 序号1, 正文1, 序号2, 正文2, ...]
+        parts = _SEGMENT_MARKER_RE.split(polished)
+        if parts[0].strip() or len(parts) != expected * 2 + 1:
+            return None
+
+        segments: list[str] = []
+        for index in range(expected):
+            if int(parts[index * 2 + 1]) != index + 1:
+                return None
+            segment = parts[index * 2 + 2].strip()
+            if not segment:
+                return None
+            segments.append(segment)
+        return segments
+
     async def _polish_chain_segments(
         self, provider: TextChatProviderProtocol, chain: MessageChain
     ) -> tuple[bool, MessageChain]:
-        """按连续 Plain 段润色，保持非文本组件的位置与顺序不变。"""
-        new_chain: MessageChain = []
-        buffer: list[Comp.Plain] = []
-        has_plain = False
-
-        async def flush_plain_buffer() -> bool:
-            nonlocal buffer
-            if not buffer:
-                return True
-
-            original_text = "\n".join(comp.text for comp in buffer).strip()
-            if not original_text:
-                new_chain.extend(buffer)
-                buffer = []
-                return True
-
-            polished_text = await self._polish_text(provider, original_text)
-            if not polished_text:
-                if self._get_failure_mode() == "fallback_original":
-                    new_chain.extend(buffer)
-                    buffer = []
-                    return True
-                buffer = []
-                return False
-
-            new_chain.append(Comp.Plain(polished_text))
-            buffer = []
-            return True
-
-        for comp in chain:
-            if isinstance(comp, Comp.Plain):
-                has_plain = True
-                buffer.append(comp)
+        """按连续 Plain 段润色，保持非文本组件的位置与顺序不变。
+
+        没有任何文本被替换时原样返回传入的 chain。
+        """
+        # 记录每个需润色的连续 Plain 段在原链中的区间 [start, end) 与合并文本。
+        runs: list[tuple[int, int, str]] = []
+        run_start: int | None = None
+
+        def close_run(end: int):
+            nonlocal run_start
+            if run_start is None:
+                return
+            original_text = "\n".join([comp.text for comp in chain[run_start:end]]).strip()
+            if original_text and not self._should_skip_polish(original_text):
+                runs.append((run_start, end, original_text))
+            run_start = None
+
+        for index, comp in enumerate(chain):
+            if isinstance(comp, _Plain):
+                if run_start is None:
+                    run_start = index
                 continue
+            close_run(index)
+        close_run(len(chain))
 
-            ok = await flush_plain_buffer()
-            if not ok:
-                return False, chain
-            new_chain.append(comp)
+        if not runs:
+            return True, chain
 
-        ok = await flush_plain_buffer()
-        if not ok:
-            return False, chain
+        polished_texts = await self._polish_runs(provider, [text for _, _, text in runs])
 
-        if not has_plain:
+        new_chain: MessageChain = []
+        cursor = 0
+        any_change = False
+        for (start, end, _), polished_text in zip(runs, polished_texts):
+            new_chain.extend(chain[cursor:start])
+            if polished_text:
+                new_chain.append(_Plain(polished_text))
+                any_change = True
+            elif self._get_failure_mode() == "fallback_original":
+                new_chain.extend(chain[start:end])
+            else:
+                return False, chain
+            cursor = end
+        if not any_change:
             return True, chain
+        new_chain.extend(chain[cursor:])
+
         return True, new_chain
 
+    def _should_skip_polish(self, text: str) -> bool:
+        """过短、纯符号/数字或单个链接的文本直接原样发送，不调用模型。"""
+        if len(text) < self._get_min_polish_chars():
+            return True
+        if _NON_WORD_TEXT_RE.fullmatch(text):
+            return True
+        return text.startswith(("http://", "https://")) and not any(
+            char.isspace() for char in text
+        )
+
     @staticmethod
     def _replace_plain_text(chain: MessageChain, polished_text: str) -> MessageChain:
         """将原有 Plain 文本替换为一段润色文本，保留非文本消息段。"""
@@ -231,20 +469,60 @@ class ChatPolisherPlugin(Star):
         replaced = False
 
         for comp in chain:
-            if isinstance(comp, Comp.Plain):
+            if isinstance(comp, _Plain):
                 if not replaced:
-                    new_chain.append(Comp.Plain(polished_text))
+                    new_chain.append(_Plain(polished_text))
                     replaced = True
                 continue
             new_chain.append(comp)
 
         if not replaced:
-            new_chain.insert(0, Comp.Plain(polished_text))
+            new_chain.insert(0, _Plain(polished_text))
 
         return new_chain
 
+    def _get_prompt_parts(self) -> tuple[str, tuple[str, ...]]:
+        """返回提示词模板及其切分片段，配置未变化时复用上次解析结果。"""
+        raw_value = self.config.get("polish_prompt", "")
+        if self._cached_prompt_parts is not None and raw_value == self._cached_prompt_source:
+            return self._cached_prompt_parts
+
+        prompt_tpl = str(raw_value or "").strip()
+        if not prompt_tpl:
+            prompt_tpl = DEFAULT_POLISH_PROMPT
+
+        # 支持 {{text}} 占位符；无占位符时自动拼接原文。
+        if "{{text}}" in prompt_tpl:
+            parts = tuple(prompt_tpl.split("{{text}}"))
+        else:
+            parts = (f"{prompt_tpl}\n\n待润色文本：\n", "")
+
+        self._cached_prompt_source = raw_value
+        self._cached_prompt_parts = (prompt_tpl, parts)
+        return self._cached_prompt_parts
+
+    def _get_parsed_config(self, key: str, default: Any, parser: Callable[[Any], Any]) -> Any:
+        """读取配置项并缓存解析结果，原始值变化时重新解析。"""
+        raw_value = self.config.get(key, default)
+        cached = self._parsed_config.get(key)
+        if cached is not None and cached[0] == raw_value:
+            return cached[1]
+
+        value = parser(raw_value)
+        self._parsed_config[key] = (raw_value, value)
+        return value
+
+    @staticmethod
+    def _parse_stripped_str(raw_value: Any) -> str:
+        return str(raw_value or "").strip()
+
     def _get_timeout_seconds(self) -> float:
-        raw_value = self.config.get("polish_timeout_seconds", 12)
+        return self._get_parsed_config(
+            "polish_timeout_seconds", 12, self._parse_timeout_seconds
+        )
+
+    @staticmethod
+    def _parse_timeout_seconds(raw_value: Any) -> float:
         try:
             timeout = float(raw_value)
         except (TypeError, ValueError):
@@ -252,19 +530,71 @@ class ChatPolisherPlugin(Star):
         return max(timeout, 0.1)
 
     def _get_failure_mode(self) -> str:
-        mode = str(self.config.get("failure_mode", "发送原文（推荐）") or "").strip()
-        mode_mapping = {
-            "fallback_original": "fallback_original",
-            "send_error": "send_error",
-            "发送原文（推荐）": "fallback_original",
-            "发送失败提示": "send_error",
-        }
-        return mode_mapping.get(mode, "fallback_original")
+        return self._get_parsed_config(
+            "failure_mode", "发送原文（推荐）", self._parse_failure_mode
+        )
+
+    @staticmethod
+    def _parse_failure_mode(raw_value: Any) -> str:
+        mode = str(raw_value or "").strip()
+        return _FAILURE_MODE_MAP.get(mode, "fallback_original")
 
     def _get_failure_message(self) -> str:
-        message = str(self.config.get("failure_message", "润色失败，请检查日志。") or "").strip()
+        return self._get_parsed_config(
+            "failure_message", "润色失败，请检查日志。", self._parse_failure_message
+        )
+
+    @staticmethod
+    def _parse_failure_message(raw_value: Any) -> str:
+        message = str(raw_value or "").strip()
         return message or "润色失败，请检查日志。"
 
+    def _get_min_polish_chars(self) -> int:
+        return self._get_parsed_config(
+            "min_polish_chars", DEFAULT_MIN_POLISH_CHARS, self._parse_min_polish_chars
+        )
+
+    @staticmethod
+    def _parse_min_polish_chars(raw_value: Any) -> int:
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            value = DEFAULT_MIN_POLISH_CHARS
+        return max(value, 0)
+
+    def _get_output_char_limit(self, text: str) -> int:
+        """润色结果的长度上限：取配置值与原文长度倍数中的较大者，0 表示不限制。"""
+        max_chars = self._get_max_polish_chars()
+        if not max_chars:
+            return 0
+        return max(max_chars, len(text) * POLISH_OUTPUT_LENGTH_RATIO)
+
+    def _get_max_polish_chars(self) -> int:
+        return self._get_parsed_config(
+            "max_polish_chars", DEFAULT_MAX_POLISH_CHARS, self._parse_max_polish_chars
+        )
+
+    @staticmethod
+    def _parse_max_polish_chars(raw_value: Any) -> int:
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            value = DEFAULT_MAX_POLISH_CHARS
+        return max(value, 0)
+
+    def _get_polish_cache_size(self) -> int:
+        return self._get_parsed_config(
+            "polish_cache_size", DEFAULT_POLISH_CACHE_SIZE, self._parse_polish_cache_size
+        )
+
+    @staticmethod
+    def _parse_polish_cache_size(raw_value: Any) -> int:
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            value = DEFAULT_POLISH_CACHE_SIZE
+        return max(value, 0)
+
     def _build_event_mark_key(self, event: AstrMessageEvent) -> str:
         # 优先使用消息来源 + message_id，避免并发会话互相影响。
         message_id = str(
@@ -277,63 +607,46 @@ class ChatPolisherPlugin(Star):
         return f"event::{id(event)}"
 
     def _has_valid_llm_mark(self, event: AstrMessageEvent) -> bool:
-        key = self._build_event_mark_key(event)
-        marked_at = self._llm_marks.get(key)
-        if marked_at is None:
-            return False
-
-        ttl = self._get_mark_retention_seconds()
-        if time.monotonic() - marked_at > ttl:
-            self._llm_marks.pop(key, None)
+        # 先淘汰过期标记，剩余标记均在保留时长内。
+        self._cleanup_expired_marks()
+        entry = self._llm_marks.get(id(event))
+        if entry is not None:
+            # id 可能被已回收事件复用，需确认弱引用仍指向当前事件。
+            event_ref = entry[1]
+            return event_ref is not None and event_ref() is event
+
+        # 仅在曾以组合标识打标时才构造该标识，常规路径无需额外开销。
+        if not self._has_composed_mark_keys:
             return False
-        return True
-
-    def _ensure_mark_cleanup_task(self):
-        if self._mark_cleanup_task and not self._mark_cleanup_task.done():
-            return
-
-        try:
-            self._mark_cleanup_task = asyncio.create_task(self._mark_cleanup_loop())
-        except RuntimeError:
-            # 事件循环未就绪时，后续钩子会再次尝试启动。
-            self._mark_cleanup_task = None
-
-    async def _mark_cleanup_loop(self):
-        # 周期清理过期标记，防止异常流程导致残留。
-        try:
-            while True:
-                interval = self._get_mark_check_interval_seconds()
-                await asyncio.sleep(interval)
-                self._cleanup_expired_marks()
-        except asyncio.CancelledError:
-            raise
-        except Exception:
-            logger.exception("[chat_polisher] 标记清理任务异常退出")
+        return self._build_event_mark_key(event) in self._llm_marks
 
     def _cleanup_expired_marks(self):
+        # 标记按打标时间有序，只需从队首弹出过期项，无需全量扫描。
         if not self._llm_marks:
             return
 
-        now = time.monotonic()
-        ttl = self._get_mark_retention_seconds()
-        expired_keys = [key for key, ts in self._llm_marks.items() if now - ts > ttl]
-        for key in expired_keys:
-            self._llm_marks.pop(key, None)
+        now_ns = time.monotonic_ns()
+        ttl_ns = self._get_mark_retention_ns()
+        while self._llm_marks:
+            oldest_key = next(iter(self._llm_marks))
+            if now_ns - self._llm_marks[oldest_key][0] <= ttl_ns:
+                break
+            self._llm_marks.popitem(last=False)
+
+    def _get_mark_retention_ns(self) -> int:
+        return self._get_parsed_config(
+            "mark_retention_seconds",
+            DEFAULT_MARK_RETENTION_SECONDS,
+            self._parse_mark_retention_ns,
+        )
 
-    def _get_mark_retention_seconds(self) -> float:
-        raw_value = self.config.get("mark_retention_seconds", DEFAULT_MARK_RETENTION_SECONDS)
+    @staticmethod
+    def _parse_mark_retention_ns(raw_value: Any) -> int:
+        # 配置以秒为单位，换算为纳秒整数以便与 monotonic_ns 直接比较。
         try:
             value = float(raw_value)
         except (TypeError, ValueError):
             value = DEFAULT_MARK_RETENTION_SECONDS
-        return max(value, 10.0)
-
-    def _get_mark_check_interval_seconds(self) -> float:
-        raw_value = self.config.get(
-            "mark_check_interval_seconds", DEFAULT_MARK_CHECK_INTERVAL_SECONDS
-        )
-        try:
-            value = float(raw_value)
-        except (TypeError, ValueError):
-            value = DEFAULT_MARK_CHECK_INTERVAL_SECONDS
-        return max(value, 1.0)
+        if not math.isfinite(value):
+            value = DEFAULT_MARK_RETENTION_SECONDS
+        return int(max(value, 10.0) * 1_000_000_000)